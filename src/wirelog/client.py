@@ -1,17 +1,25 @@
-"""WireLog analytics client. Zero external dependencies — stdlib only."""
+"""WireLog analytics client. Zero external dependencies — stdlib only.
+
+If ``orjson`` is installed (``pip install wirelog[fast]``) it is used
+for JSON encoding and decoding; otherwise the stdlib ``json`` module is.
+"""
 
 from __future__ import annotations
 
 import atexit
+import dataclasses
+import datetime
+import enum
+import gzip
 import json
 import os
 import queue
 import threading
 import time
 import uuid
+from http.client import HTTPException, RemoteDisconnected
 from typing import Any, Callable
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from urllib.error import URLError
 
 from wirelog.ratelimit import (
     DropReason,
@@ -20,18 +28,37 @@ from wirelog.ratelimit import (
     RateLimitStats,
     parse_retry_after,
 )
+from wirelog.transport import (
+    DEFAULT_POOL_MAXSIZE,
+    ConnectionPool,
+    drain,
+    shared_pool,
+)
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is the default.
+    orjson = None  # type: ignore[assignment]
 
 __version__ = "0.3.0"
+_LIBRARY = f"wirelog-python/{__version__}"
 
 _BATCH_MAX = 10
 _QUEUE_MAX = 10000
 _MAX_BATCH_API_SIZE = 2000
+_BATCH_CHUNK_SIZE = 500
 _RETRY_MAX = 3
 _RETRY_BASE_S = 1.0
 _RETRY_MAX_DELAY_S = 30.0
 _DEFAULT_FLUSH_INTERVAL = 2.0
 _DEFAULT_TIMEOUT = 30
 _DEFAULT_HOST = "https://api.wirelog.ai"
+_GZIP_MIN_BYTES = 1024
+# Errors from writing to / reading from a keep-alive socket the server
+# already closed.
+_STALE_CONNECTION_ERRORS = (RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+# Queued by flush() to make the worker send its pending batch right away.
+_FLUSH: dict[str, Any] = {}
 
 
 class WireLogError(Exception):
@@ -47,6 +74,10 @@ class WireLogError(Exception):
         self.retry_after = retry_after
 
 
+class _ConnectError(URLError):
+    """Transport failure before the request was sent (safe to retry)."""
+
+
 class RateLimitedError(Exception):
     """Reported to ``on_error`` when an event is dropped by the per-instance rate limiter."""
 
@@ -70,6 +101,8 @@ class WireLog:
     """WireLog analytics client.
 
     Zero external dependencies. Uses only the Python standard library.
+    HTTP connections are kept alive and reused across requests, and are
+    shared by all clients in the process that talk to the same host.
 
     By default, ``track()`` buffers events in memory and flushes them
     in batches via a background thread (non-blocking). Call ``close()``
@@ -78,6 +111,10 @@ class WireLog:
     Set ``flush_interval=0`` to disable background batching and send
     each ``track()`` call synchronously (legacy behavior).
 
+    Instances use ``__slots__``: attributes cannot be added or patched on
+    an instance (``mock.patch.object(client, "track")`` fails); patch the
+    class or use ``mock.create_autospec(WireLog, instance=True)`` instead.
+
     Args:
         api_key: API key (pk_, sk_, or aat_). Falls back to WIRELOG_API_KEY env var.
         host: API base URL. Falls back to WIRELOG_HOST env var. Default https://api.wirelog.ai.
@@ -90,8 +127,55 @@ class WireLog:
         on_error: Callback for background errors. Called from the flush thread.
             If None, background errors are silently discarded.
         disabled: If True, track() is a no-op. Useful for test environments.
+        max_in_flight: Max batch requests the background worker keeps in
+            flight at once. Default 1 (batches are sent one after another).
+        max_retries: Retries for transient failures with exponential
+            backoff, honouring Retry-After. Applies to every request, not
+            just background batches. 429/5xx responses and failures to
+            connect are always retried; a timeout or reset after the
+            request was sent is retried only when resending is safe
+            (``query`` and events that all carry an ``insert_id``), never
+            for ``identify``. Each attempt can take up to ``timeout``, so
+            a synchronous call may block for about
+            ``(max_retries + 1) * timeout`` plus backoff (1 + 2 + 4 s, or
+            Retry-After capped at 30 s per retry) — roughly 2 minutes
+            with the defaults. Default 3.
+        auto_insert_id: If True, ``track()`` generates an ``insert_id`` for
+            events that lack one so retried sends are deduplicated by the
+            server. Set False for fire-and-forget telemetry to save the id
+            generation and 47 bytes of JSON per event (the 32-char id
+            plus its key, quotes and comma). Default True.
+        compress: If True, gzip request bodies of 1 KiB or more
+            (``Content-Encoding: gzip``). The API host must accept
+            gzip-encoded requests. Default False.
     """
 
+    __slots__ = (
+        "api_key",
+        "host",
+        "timeout",
+        "disabled",
+        "_on_error",
+        "_batch_size",
+        "_flush_interval",
+        "_max_retries",
+        "_auto_insert_id",
+        "_closed",
+        "_limiter",
+        "_pool",
+        "_pool_size",
+        "_targets",
+        "_headers",
+        "_compress",
+        "_gzip_headers",
+        "_async",
+        "_queue",
+        "_send_queue",
+        "_senders",
+        "_thread",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -103,8 +187,15 @@ class WireLog:
         on_error: Callable[[Exception], None] | None = None,
         disabled: bool = False,
         rate_limit: RateLimitConfig | None = None,
+        max_in_flight: int = 1,
+        max_retries: int = _RETRY_MAX,
+        auto_insert_id: bool = True,
+        compress: bool = False,
         _now: Callable[[], float] | None = None,
     ) -> None:
+        # Env fallbacks are read per construction (and only when the argument
+        # is omitted), not cached at import, so variables loaded after import
+        # (e.g. by python-dotenv) are still picked up.
         self.api_key = api_key or os.environ.get("WIRELOG_API_KEY", "")
         self.host = (
             host or os.environ.get("WIRELOG_HOST", _DEFAULT_HOST)
@@ -112,10 +203,19 @@ class WireLog:
         self.timeout = timeout
         self.disabled = disabled
         self._on_error = on_error
-        self._batch_size = min(max(batch_size, 1), 2000)
+        self._batch_size = min(max(batch_size, 1), _MAX_BATCH_API_SIZE)
         self._flush_interval = flush_interval
+        self._max_retries = max(max_retries, 0)
+        self._auto_insert_id = auto_insert_id
         self._closed = False
         self._limiter = RateLimiter(rate_limit, now=_now)
+        max_in_flight = max(max_in_flight, 1)
+        self._compress = compress
+        # The connection pool (and the request targets/headers derived from
+        # it) is built on the first request, so constructing a client —
+        # in particular a disabled one — never fails on a bad host.
+        self._pool: ConnectionPool | None = None
+        self._pool_size = max(max_in_flight, DEFAULT_POOL_MAXSIZE)
 
         # Async mode: background thread + queue.
         self._async = flush_interval > 0
@@ -123,7 +223,25 @@ class WireLog:
             self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(
                 maxsize=queue_size
             )
-            self._flush_event = threading.Event()
+            # Concurrent sends: daemon sender threads fed through a bounded
+            # hand-off queue, so the worker blocks (and the event queue
+            # absorbs backpressure) once every sender is busy and the
+            # hand-off queue is full. Daemon threads never hold up exit.
+            self._send_queue: queue.Queue[list[dict[str, Any]] | None] | None = None
+            self._senders: list[threading.Thread] = []
+            if max_in_flight > 1:
+                self._send_queue = queue.Queue(maxsize=max_in_flight)
+                self._senders = [
+                    threading.Thread(
+                        target=self._sender,
+                        args=(self._send_queue,),
+                        daemon=True,
+                        name="wirelog-send",
+                    )
+                    for _ in range(max_in_flight)
+                ]
+                for sender in self._senders:
+                    sender.start()
             self._thread = threading.Thread(
                 target=self._worker, daemon=True, name="wirelog-flush"
             )
@@ -165,7 +283,17 @@ class WireLog:
             self._report_error(RateLimitedError(reason))
             return None
 
-        body: dict[str, Any] = {"event_type": event_type}
+        # Always-present fields go in one literal; optional ones are
+        # added only when set.
+        body: dict[str, Any] = {
+            "event_type": event_type,
+            "time": _iso_now(),
+            "library": _LIBRARY,
+        }
+        if insert_id:
+            body["insert_id"] = insert_id
+        elif self._auto_insert_id:
+            body["insert_id"] = _new_insert_id()
         if user_id is not None:
             body["user_id"] = user_id
         if device_id is not None:
@@ -176,19 +304,22 @@ class WireLog:
             body["event_properties"] = event_properties
         if user_properties is not None:
             body["user_properties"] = user_properties
-        body["insert_id"] = insert_id or uuid.uuid4().hex
         if origin is not None:
             body["origin"] = origin
         if client_originated is not None:
             body["clientOriginated"] = client_originated
-        body["time"] = _iso_now()
-        body["library"] = f"wirelog-python/{__version__}"
 
-        # L5: per-event payload size cap.
+        # L5: per-event payload size cap. Property-free events (the common
+        # shape) hold only a few strings, so a cheap upper bound usually
+        # proves they fit without serializing them.
         max_bytes = self._limiter.max_event_bytes()
-        if max_bytes > 0:
+        if max_bytes > 0 and not (
+            event_properties is None
+            and user_properties is None
+            and 0 <= _flat_size_bound(body) <= max_bytes
+        ):
             try:
-                serialized = json.dumps(body).encode("utf-8")
+                serialized = _dumps(body)
             except (TypeError, ValueError) as exc:
                 self._limiter.record_payload_drop()
                 self._report_error(exc)
@@ -199,7 +330,9 @@ class WireLog:
                 return None
 
         if not self._async:
-            return self._post("/track", body)
+            return self._post_with_retry(
+                "/track", body, resend="insert_id" in body
+            )
 
         # Non-blocking enqueue.
         try:
@@ -208,6 +341,7 @@ class WireLog:
             # Drop oldest event to make room.
             try:
                 self._queue.get_nowait()
+                self._queue.task_done()
             except queue.Empty:
                 pass
             try:
@@ -225,24 +359,21 @@ class WireLog:
         origin: str | None = None,
         client_originated: bool | None = None,
     ) -> dict[str, Any]:
-        """Track multiple events in a single request (up to 2000).
+        """Track multiple events, sent in requests of up to 500 events.
 
         Always sends immediately, regardless of async/sync mode.
 
         Each event in the batch is checked individually against the
         per-instance rate limiter (L1+L2) and the per-event payload size
         cap (L5). Events that fail either check are silently dropped from
-        the batch and counted in ``rate_limit_stats()``. Batches larger
-        than 2000 events raise ``ValueError`` (matches the server's
-        ``MaxBatchSize``). When the client is disabled or closed, returns
-        ``{"accepted": 0}`` without sending.
+        the batch and counted in ``rate_limit_stats()``. Larger batches are
+        split into consecutive requests (bounding each request body) and
+        the ``accepted`` counts are summed; if a request fails, the error
+        is raised and earlier chunks stay sent. When the client is
+        disabled or closed, returns ``{"accepted": 0}`` without sending.
         """
         if self.disabled or self._closed:
             return {"accepted": 0}
-        if len(events) > _MAX_BATCH_API_SIZE:
-            raise ValueError(
-                f"wirelog: batch of {len(events)} events exceeds max {_MAX_BATCH_API_SIZE}"
-            )
 
         survivors: list[dict[str, Any]] = []
         max_bytes = self._limiter.max_event_bytes()
@@ -253,7 +384,7 @@ class WireLog:
                 continue
             if max_bytes > 0:
                 try:
-                    serialized = json.dumps(event).encode("utf-8")
+                    serialized = _dumps(event)
                 except (TypeError, ValueError) as exc:
                     self._limiter.record_payload_drop()
                     self._report_error(exc)
@@ -269,12 +400,27 @@ class WireLog:
         if not survivors:
             return {"accepted": 0}
 
-        body: dict[str, Any] = {"events": survivors}
-        if origin is not None:
-            body["origin"] = origin
-        if client_originated is not None:
-            body["clientOriginated"] = client_originated
-        return self._post("/track", body)
+        results = []
+        for start in range(0, len(survivors), _BATCH_CHUNK_SIZE):
+            body: dict[str, Any] = {
+                "events": survivors[start : start + _BATCH_CHUNK_SIZE]
+            }
+            if origin is not None:
+                body["origin"] = origin
+            if client_originated is not None:
+                body["clientOriginated"] = client_originated
+            results.append(
+                self._post_with_retry(
+                    "/track", body, resend=_all_deduplicated(body["events"])
+                )
+            )
+        if len(results) == 1:
+            return results[0]
+        return {
+            "accepted": sum(
+                r.get("accepted", 0) for r in results if isinstance(r, dict)
+            )
+        }
 
     def query(
         self,
@@ -285,9 +431,10 @@ class WireLog:
         offset: int = 0,
     ) -> Any:
         """Run a pipe DSL query. Returns Markdown (default), JSON, or CSV."""
-        return self._post(
+        return self._post_with_retry(
             "/query",
             {"q": q, "format": format, "limit": limit, "offset": offset},
+            resend=True,
         )
 
     def identify(
@@ -316,27 +463,33 @@ class WireLog:
             body["user_properties"] = user_properties
         if user_property_ops is not None:
             body["user_property_ops"] = user_property_ops
-        return self._post("/identify", body)
+        # Not idempotent (user_property_ops can increment): never resend
+        # a request the server may already have applied.
+        return self._post_with_retry("/identify", body, resend=False)
 
     def rate_limit_stats(self) -> RateLimitStats:
         """Return a snapshot of per-instance rate limiter drop counters."""
         return self._limiter.stats()
 
     def flush(self) -> None:
-        """Flush all buffered events. Blocks until the queue is drained.
+        """Flush all buffered events. Blocks until every queued event has
+        been sent (or dropped after retries).
 
         No-op in sync mode or when disabled.
         """
         if not self._async or self.disabled or self._closed:
             return
-        self._flush_event.set()
-        # Wait for the queue to drain.
+        # Wake the worker so it sends its pending batch now, then wait for
+        # the queue to drain.
+        self._queue.put(_FLUSH)
         self._queue.join()
 
     def close(self) -> None:
         """Flush remaining events and stop the background thread.
 
-        Idempotent — safe to call multiple times.
+        Pooled HTTP connections are shared with other clients for the same
+        host and stay open for reuse. Idempotent — safe to call multiple
+        times.
         """
         if self._closed:
             return
@@ -345,106 +498,245 @@ class WireLog:
             return
         # Send sentinel to stop the worker.
         self._queue.put(None)
-        self._flush_event.set()
         self._thread.join(timeout=10.0)
 
     # --- Background worker ---
 
     def _worker(self) -> None:
-        """Background thread that batches and sends events."""
+        """Background thread that batches and sends events.
+
+        A batch is sent when it reaches ``batch_size``, when its oldest
+        event has waited ``flush_interval`` seconds, or on ``flush()``.
+        Each event is acknowledged (``task_done``) only once its batch has
+        been delivered, so ``flush()`` waits for in-flight requests.
+        """
         batch: list[dict[str, Any]] = []
+        deadline = 0.0
         while True:
-            # Wait for events or flush signal.
+            # Wait for events, but no longer than the pending batch's deadline.
+            if batch:
+                timeout = max(deadline - time.monotonic(), 0.0)
+            else:
+                timeout = self._flush_interval
+            flush = False
             try:
-                event = self._queue.get(timeout=self._flush_interval)
-                if event is None:
-                    # Sentinel — flush and exit.
-                    self._send_batch(batch)
-                    self._queue.task_done()
-                    return
-                batch.append(event)
-                self._queue.task_done()
+                event = self._queue.get(timeout=timeout)
             except queue.Empty:
                 pass
-
-            # Drain available events up to batch size.
-            while len(batch) < self._batch_size:
-                try:
-                    event = self._queue.get_nowait()
+            else:
+                # Take whatever else is already queued, up to batch size.
+                while True:
                     if event is None:
-                        self._send_batch(batch)
-                        self._queue.task_done()
+                        # Sentinel — flush and exit.
+                        self._finish(batch)
                         return
+                    if event is _FLUSH:
+                        # Marker from flush(): send what was queued before it.
+                        self._queue.task_done()
+                        flush = True
+                        break
+                    if not batch:
+                        deadline = time.monotonic() + self._flush_interval
                     batch.append(event)
-                    self._queue.task_done()
-                except queue.Empty:
-                    break
-
-            # Flush if batch is full or interval elapsed.
-            if len(batch) >= self._batch_size or self._flush_event.is_set():
-                self._flush_event.clear()
-                self._send_batch(batch)
+                    if len(batch) >= self._batch_size:
+                        break
+                    try:
+                        event = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+            # Flush if batch is full, interval elapsed, or flush() was called.
+            if (
+                len(batch) >= self._batch_size
+                or flush
+                or (batch and time.monotonic() >= deadline)
+            ):
+                self._dispatch(batch)
                 batch = []
 
+    def _finish(self, batch: list[dict[str, Any]]) -> None:
+        """Send the final batch, wait for in-flight sends, ack the sentinel."""
+        self._dispatch(batch)
+        if self._send_queue is not None:
+            for _ in self._senders:
+                self._send_queue.put(None)
+            for sender in self._senders:
+                sender.join()
+        self._queue.task_done()
+
+    def _dispatch(self, batch: list[dict[str, Any]]) -> None:
+        """Send ``batch`` inline, or hand it to a sender thread."""
+        if not batch:
+            return
+        if self._send_queue is None:
+            self._deliver(batch)
+            return
+        self._send_queue.put(batch)
+
+    def _sender(self, batches: queue.Queue[list[dict[str, Any]] | None]) -> None:
+        """Sender thread: deliver handed-off batches until a sentinel."""
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            self._deliver(batch)
+
+    def _deliver(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            self._send_batch(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
     def _send_batch(self, events: list[dict[str, Any]]) -> None:
         """Send a batch of events with retry on transient errors."""
         if not events:
             return
+        try:
+            self._post_with_retry(
+                "/track",
+                {"events": events},
+                decode=False,
+                resend=_all_deduplicated(events),
+            )
+        except (WireLogError, URLError, OSError, TypeError, ValueError) as e:
+            # TypeError/ValueError: an event that could not be serialized
+            # (only possible when the size check was skipped).
+            self._report_error(e)
+
+    # --- HTTP transport ---
 
-        payload: dict[str, Any] = {"events": events}
-        for attempt in range(_RETRY_MAX + 1):
-            retry_after = 0.0
+    def _post_with_retry(
+        self,
+        path: str,
+        body: dict[str, Any],
+        *,
+        decode: bool = True,
+        resend: bool,
+    ) -> Any:
+        """``_post`` with exponential backoff on transient errors.
+
+        429/5xx responses and connect failures are retried up to
+        ``max_retries`` times. Other transport errors (read timeouts,
+        resets) may strike after the server applied the request, so they
+        are retried only when ``resend`` says a duplicate is harmless.
+        The last error is re-raised.
+        """
+        attempt = 0
+        while True:
             try:
-                self._post("/track", payload)
-                return
+                return self._post(path, body, decode=decode, resend=resend)
             except WireLogError as e:
-                if not _is_retryable(e.status):
-                    self._report_error(e)
-                    return
-                if attempt >= _RETRY_MAX:
-                    self._report_error(e)
-                    return
-                retry_after = e.retry_after
+                if not _is_retryable(e.status) or attempt >= self._max_retries:
+                    raise
+                delay = _retry_delay(attempt, e.retry_after)
             except (URLError, OSError) as e:
-                if attempt >= _RETRY_MAX:
-                    self._report_error(e)
-                    return
-
-            # L6: prefer the server-provided Retry-After when present.
-            if retry_after > 0:
-                delay = min(retry_after, _RETRY_MAX_DELAY_S)
-            else:
-                delay = min(_RETRY_BASE_S * (2**attempt), _RETRY_MAX_DELAY_S)
+                if attempt >= self._max_retries:
+                    raise
+                if not resend and not isinstance(e, _ConnectError):
+                    raise
+                delay = _retry_delay(attempt, 0.0)
             time.sleep(delay)
+            attempt += 1
 
-    # --- HTTP transport ---
+    def _get_pool(self) -> ConnectionPool:
+        """Return the connection pool, creating it on first use.
 
-    def _post(self, path: str, body: dict[str, Any]) -> Any:
-        """Send a POST request to the WireLog API."""
-        url = f"{self.host}{path}"
-        data = json.dumps(body).encode("utf-8")
-        req = Request(
-            url,
-            data=data,
-            headers={
+        Raises ``ValueError`` if ``host`` is not an http(s) URL.
+        """
+        pool = self._pool
+        if pool is None:
+            # Connections are shared by every client talking to the same
+            # host; only the per-instance headers (API key) differ.
+            pool = shared_pool(self.host, self.timeout, maxsize=self._pool_size)
+            # Request targets and headers are identical for every call;
+            # build them once.
+            self._targets = {
+                path: pool.target(path) for path in ("/track", "/query", "/identify")
+            }
+            self._headers = {
                 "Content-Type": "application/json",
-                "User-Agent": f"wirelog-python/{__version__}",
-                "X-API-Key": self.api_key,
-            },
-            method="POST",
-        )
-        try:
-            with urlopen(req, timeout=self.timeout) as resp:
-                raw = resp.read()
-                content_type = resp.headers.get("Content-Type", "")
-                if "application/json" in content_type:
-                    return json.loads(raw)
-                return raw.decode("utf-8")
-        except HTTPError as e:
-            msg = e.read().decode("utf-8", errors="replace")
-            retry_after_header = e.headers.get("Retry-After") if e.headers else None
-            retry_after = parse_retry_after(retry_after_header)
-            raise WireLogError(e.code, msg, retry_after=retry_after) from e
+                "User-Agent": _LIBRARY,
+                "X-Api-Key": self.api_key,
+                **pool.headers,
+            }
+            self._gzip_headers = {**self._headers, "Content-Encoding": "gzip"}
+            # Published last so concurrent callers never see it half-built.
+            self._pool = pool
+        return pool
+
+    def _post(
+        self,
+        path: str,
+        body: dict[str, Any],
+        *,
+        decode: bool = True,
+        resend: bool = False,
+    ) -> Any:
+        """Send a POST request to the WireLog API over a pooled connection.
+
+        Transport failures are raised as ``URLError`` (as ``urlopen`` did);
+        non-2xx responses as :class:`WireLogError`. With ``decode=False``
+        a successful response body is discarded unparsed and None is
+        returned (the background worker never looks at it). ``resend``
+        has the same meaning as for ``_post_with_retry``.
+        """
+        pool = self._get_pool()
+        target = self._targets.get(path) or pool.target(path)
+        data = _dumps(body)
+        headers = self._headers
+        if self._compress and len(data) >= _GZIP_MIN_BYTES:
+            # Level 1: batch JSON is highly redundant, so the fastest
+            # setting already shrinks it several-fold.
+            data = gzip.compress(data, compresslevel=1, mtime=0)
+            headers = self._gzip_headers
+        retried = False
+        while True:
+            reused = False
+            sent = False
+            try:
+                with pool.connection(fresh=retried) as conn:
+                    # An open socket means an idle keep-alive connection.
+                    reused = conn.sock is not None
+                    if not reused:
+                        # Connect explicitly so failures here are known to
+                        # precede sending anything.
+                        try:
+                            conn.connect()
+                        except (HTTPException, OSError) as e:
+                            raise _ConnectError(e) from e
+                    conn.request("POST", target, body=data, headers=headers)
+                    sent = True
+                    resp = conn.getresponse()
+                    if decode or not 200 <= resp.status < 300:
+                        raw = resp.read()
+                    else:
+                        drain(resp)
+                        raw = b""
+                break
+            except _ConnectError:
+                raise
+            except _STALE_CONNECTION_ERRORS as e:
+                # The server may close an idle connection at any time;
+                # retry once on a new socket before reporting failure.
+                # Once the whole request was written the server may have
+                # applied it, so that only happens when a resend is safe.
+                if not reused or retried or (sent and not resend):
+                    raise URLError(e) from e
+                retried = True
+            except (HTTPException, OSError) as e:
+                raise URLError(e) from e
+
+        if not 200 <= resp.status < 300:
+            msg = raw.decode("utf-8", errors="replace")
+            retry_after = parse_retry_after(resp.getheader("Retry-After"))
+            raise WireLogError(resp.status, msg, retry_after=retry_after)
+        if not decode:
+            return None
+        content_type = resp.getheader("Content-Type", "")
+        if content_type.startswith("application/json"):
+            return _loads(raw)
+        return raw.decode("utf-8")
 
     def _report_error(self, err: Exception) -> None:
         if self._on_error is not None:
@@ -454,10 +746,133 @@ class WireLog:
                 pass  # never let error callback crash the worker
 
 
+def _json_default(obj: Any) -> Any:
+    """Encode the extra types orjson handles natively, the way it does."""
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.time) and obj.tzinfo is None:
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON bytes with stdlib json.
+
+    Output matches orjson's: non-ASCII text is written as UTF-8 rather
+    than ``\\uXXXX`` escapes (so ``max_event_bytes`` measures the same
+    size either way), lone surrogates are rejected, and datetimes,
+    UUIDs, enums and dataclasses are encoded as orjson encodes them.
+    """
+    text = json.dumps(
+        obj, separators=(",", ":"), ensure_ascii=False, default=_json_default
+    )
+    return text.encode("utf-8")
+
+
+if orjson is not None:
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize ``obj`` to compact UTF-8 JSON bytes."""
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson rejects ints wider than 64 bits, which stdlib json
+            # accepts; let stdlib decide so the optional extra never
+            # changes which payloads are sent.
+            return _json_dumps(obj)
+
+    _loads = orjson.loads
+else:
+    _dumps = _json_dumps
+    _loads = json.loads
+
+
+# Worst-case JSON bytes per ASCII character: a control character escapes
+# to six bytes ("\u0000").
+_MAX_JSON_BYTES_PER_CHAR = 6
+# str fields a property-free track() body can carry.
+_FLAT_EVENT_FIELDS = (
+    "event_type",
+    "insert_id",
+    "time",
+    "library",
+    "user_id",
+    "device_id",
+    "session_id",
+    "origin",
+)
+# Serialized size of such a body with every str field set to "".
+_FLAT_EVENT_OVERHEAD = len(
+    _dumps({**dict.fromkeys(_FLAT_EVENT_FIELDS, ""), "clientOriginated": False})
+)
+
+
+def _flat_size_bound(body: dict[str, Any]) -> int:
+    """Upper bound on the JSON size of a property-free ``track()`` body.
+
+    Returns -1 when a value is not a str or bool, or is a non-ASCII str,
+    in which case the size can only be known by serializing. Serializing
+    also rejects what the encoder cannot handle (e.g. lone surrogates)
+    before the event is queued.
+    """
+    chars = 0
+    for value in body.values():
+        kind = type(value)
+        if kind is str:
+            if not value.isascii():
+                return -1
+            chars += len(value)
+        elif kind is not bool:
+            return -1
+    return _FLAT_EVENT_OVERHEAD + chars * _MAX_JSON_BYTES_PER_CHAR
+
+
+def _new_insert_id() -> str:
+    """Random 128-bit dedup key as 32 hex chars.
+
+    Same shape as ``uuid.uuid4().hex`` without building a ``UUID`` object.
+    """
+    return os.urandom(16).hex()
+
+
+# (epoch second, formatted) of the last _iso_now() call. Replaced as a
+# whole tuple so concurrent readers never see a torn pair.
+_iso_cache: tuple[int, str] = (-1, "")
+
+
 def _iso_now() -> str:
-    """Current UTC time in ISO 8601 format."""
-    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    """Current UTC time in ISO 8601 format.
+
+    The output has one-second resolution, so the formatted string is
+    cached and only rebuilt when the second changes.
+    """
+    global _iso_cache
+    now = int(time.time())
+    second, formatted = _iso_cache
+    if now != second:
+        formatted = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _iso_cache = (now, formatted)
+    return formatted
 
 
 def _is_retryable(status: int) -> bool:
     return status == 429 or 500 <= status < 600
+
+
+def _all_deduplicated(events: list[dict[str, Any]]) -> bool:
+    """Whether every event carries an ``insert_id`` (server dedups resends)."""
+    return all(event.get("insert_id") for event in events)
+
+
+def _retry_delay(attempt: int, retry_after: float) -> float:
+    """Backoff before retry ``attempt + 1``."""
+    # L6: prefer the server-provided Retry-After when present.
+    if retry_after > 0:
+        return min(retry_after, _RETRY_MAX_DELAY_S)
+    return min(_RETRY_BASE_S * (2**attempt), _RETRY_MAX_DELAY_S)
@@ -0,0 +1,260 @@
+"""Persistent HTTP connections for the WireLog client.
+
+``urllib.request.urlopen`` opens a fresh TCP (and TLS) connection for
+every call. ``ConnectionPool`` instead keeps a small set of idle
+``http.client`` connections to the API host so consecutive requests
+reuse an open socket and skip the handshake. ``shared_pool`` hands out
+one pool per API host for the whole process, so several clients (e.g.
+one per tenant API key) share sockets. All public functions and methods
+are thread-safe.
+
+Proxies configured via the standard ``*_proxy`` environment variables
+are honoured, matching ``urlopen``: HTTPS goes through a CONNECT tunnel,
+plain HTTP uses absolute-form request targets.
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import select
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.client import HTTPConnection, HTTPResponse, HTTPSConnection
+from typing import Iterator
+from urllib.parse import unquote, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+DEFAULT_POOL_MAXSIZE = 10
+_DRAIN_CHUNK = 8192
+_MAX_SHARED_POOLS = 16
+
+# Per-thread scratch buffer for drain(); concurrent senders each get one.
+_scratch = threading.local()
+
+
+class ConnectionPool:
+    """Bounded pool of keep-alive connections to one API host.
+
+    Connections are created on demand and returned to the pool after
+    use; at most ``maxsize`` idle connections are retained. A connection
+    whose ``with`` block raises is closed instead of being reused, and an
+    idle one the server has already closed is discarded when checked out.
+
+    Args:
+        base_url: API base URL, e.g. ``https://api.wirelog.ai``.
+        timeout: Socket timeout in seconds for new connections.
+        maxsize: Max idle connections kept open. Default 10.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        maxsize: int = DEFAULT_POOL_MAXSIZE,
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"wirelog: unsupported URL scheme in {base_url!r}")
+        self._scheme = parts.scheme
+        self._host = parts.hostname or ""
+        self._port = parts.port
+        self._base_path = parts.path.rstrip("/")
+        self._timeout = timeout
+        self._maxsize = max(maxsize, 1)
+        self._idle: list[HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        _all_pools.add(self)
+
+        self._proxy = _proxy_for(self._scheme, self._host)
+        self._origin = f"{self._scheme}://{parts.netloc}"
+        # Extra headers sent with every request (plain-HTTP proxy auth only;
+        # HTTPS proxy auth travels on the CONNECT request instead).
+        self.headers: dict[str, str] = {}
+        if self._proxy is not None and self._scheme == "http":
+            auth = _proxy_auth(self._proxy)
+            if auth:
+                self.headers["Proxy-Authorization"] = auth
+
+    def target(self, path: str) -> str:
+        """Return the request-target to send for an API ``path``."""
+        if self._proxy is not None and self._scheme == "http":
+            return f"{self._origin}{self._base_path}{path}"
+        return f"{self._base_path}{path}"
+
+    @contextmanager
+    def connection(self, fresh: bool = False) -> Iterator[HTTPConnection]:
+        """Check out a connection for one request/response exchange.
+
+        The response must be read completely inside the ``with`` block so
+        the connection can be reused. With ``fresh=True`` a new, not yet
+        connected connection is returned instead of an idle one.
+        """
+        conn = self._new_connection() if fresh else self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn)
+
+    def close(self) -> None:
+        """Close all idle connections. Checked-out ones close on release."""
+        with self._lock:
+            self._closed = True
+        self.close_idle()
+
+    def close_idle(self) -> None:
+        """Close idle connections; the pool stays usable."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def grow(self, maxsize: int) -> None:
+        """Raise the idle-connection cap to at least ``maxsize``."""
+        with self._lock:
+            self._maxsize = max(self._maxsize, maxsize)
+
+    def _after_fork(self) -> None:
+        # The child must not share sockets (or a possibly held lock) with
+        # the parent; start over with an empty pool.
+        self._lock = threading.Lock()
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _acquire(self) -> HTTPConnection:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            if not _is_dropped(conn):
+                return conn
+            conn.close()
+        return self._new_connection()
+
+    def _release(self, conn: HTTPConnection) -> None:
+        with self._lock:
+            if not self._closed and len(self._idle) < self._maxsize:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _new_connection(self) -> HTTPConnection:
+        cls = HTTPSConnection if self._scheme == "https" else HTTPConnection
+        if self._proxy is None:
+            return cls(self._host, self._port, timeout=self._timeout)
+
+        proxy = urlsplit(self._proxy)
+        conn = cls(proxy.hostname or "", proxy.port, timeout=self._timeout)
+        if self._scheme == "https":
+            auth = _proxy_auth(self._proxy)
+            conn.set_tunnel(
+                self._host,
+                self._port,
+                headers={"Proxy-Authorization": auth} if auth else None,
+            )
+        return conn
+
+
+# Every live pool, so a forked child can reset them; shared pools by
+# (base_url, timeout), least recently used first.
+_all_pools: weakref.WeakSet[ConnectionPool] = weakref.WeakSet()
+_shared_pools: OrderedDict[tuple[str, float], ConnectionPool] = OrderedDict()
+_shared_lock = threading.Lock()
+
+
+def shared_pool(
+    base_url: str, timeout: float, maxsize: int = DEFAULT_POOL_MAXSIZE
+) -> ConnectionPool:
+    """Return the process-wide pool for ``base_url`` and ``timeout``.
+
+    Created on first use. At most 16 pools are kept; when another is
+    needed the least recently used one is dropped from the registry and
+    its idle connections are closed (clients still holding it keep
+    working and simply reconnect).
+    """
+    key = (base_url, timeout)
+    evicted: list[ConnectionPool] = []
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(base_url, timeout, maxsize)
+            _shared_pools[key] = pool
+            while len(_shared_pools) > _MAX_SHARED_POOLS:
+                evicted.append(_shared_pools.popitem(last=False)[1])
+        else:
+            _shared_pools.move_to_end(key)
+            pool.grow(maxsize)
+    for old in evicted:
+        old.close_idle()
+    return pool
+
+
+def _reset_after_fork() -> None:
+    global _shared_lock
+    _shared_lock = threading.Lock()
+    for pool in list(_all_pools):
+        pool._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def drain(resp: HTTPResponse) -> None:
+    """Read and discard the rest of ``resp`` so its connection can be reused.
+
+    Bytes land in a per-thread buffer that is reused across calls rather
+    than in a fresh ``bytes`` object per response.
+    """
+    buf = getattr(_scratch, "buf", None)
+    if buf is None:
+        buf = _scratch.buf = memoryview(bytearray(_DRAIN_CHUNK))
+    while resp.readinto(buf):
+        pass
+
+
+def _is_dropped(conn: HTTPConnection) -> bool:
+    """True if idle ``conn`` was closed by the server (or is unusable).
+
+    An idle keep-alive socket should have nothing to read; if it polls
+    readable the server has sent EOF (or stray data) and the connection
+    cannot carry another request. Same check as urllib3's
+    ``is_connection_dropped``.
+    """
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        if hasattr(select, "poll"):
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            return bool(poller.poll(0))
+        return bool(select.select([sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def _proxy_for(scheme: str, host: str) -> str | None:
+    """Return the proxy URL configured for ``scheme``, or None."""
+    proxy = getproxies().get(scheme)
+    if not proxy or proxy_bypass(host):
+        return None
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    return proxy
+
+
+def _proxy_auth(proxy: str) -> str:
+    """Basic ``Proxy-Authorization`` value for credentials in ``proxy``."""
+    parts = urlsplit(proxy)
+    if parts.username is None:
+        return ""
+    creds = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+    return "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
+import dataclasses
+import datetime
+import enum
+import gzip
 import json
+import os
+import socket
+import subprocess
+import sys
+import time
 import unittest
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from threading import Thread
+import uuid
+import weakref
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from threading import Lock, Thread
 from typing import Any
+from unittest import mock
+from urllib.error import URLError
 
-from wirelog import WireLog
+from wirelog import RateLimitConfig, WireLog, WireLogError
+from wirelog.client import _ConnectError, _dumps, _flat_size_bound, _iso_now
 
 
 class MockHandler(BaseHTTPRequestHandler):
@@ -17,16 +31,23 @@ class MockHandler(BaseHTTPRequestHandler):
     last_request: dict[str, Any] = {}
     response_body: dict[str, Any] = {"accepted": 1}
     response_status: int = 200
+    fail_next: int = 0  # Respond 503 to this many requests before succeeding.
 
     def do_POST(self) -> None:
         length = int(self.headers.get("Content-Length", 0))
         body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
         MockHandler.last_request = {
             "path": self.path,
             "headers": dict(self.headers),
             "body": json.loads(body) if body else {},
         }
-        self.send_response(MockHandler.response_status)
+        status = MockHandler.response_status
+        if MockHandler.fail_next > 0:
+            MockHandler.fail_next -= 1
+            status = 503
+        self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.end_headers()
         self.wfile.write(json.dumps(MockHandler.response_body).encode())
@@ -155,15 +176,397 @@ class TestWireLogClient(unittest.TestCase):
             MockHandler.last_request["headers"]["X-Api-Key"], "sk_test_key"
         )
 
+    def test_track_sends_wide_ints(self) -> None:
+        MockHandler.response_body = {"accepted": 1}
+        MockHandler.response_status = 200
+        client = self._client()
+
+        result = client.track("test", event_properties={"n": 2**70})
+
+        self.assertEqual(result, {"accepted": 1})
+        self.assertEqual(
+            MockHandler.last_request["body"]["event_properties"], {"n": 2**70}
+        )
+
+    def test_auto_insert_id_disabled(self) -> None:
+        MockHandler.response_body = {"accepted": 1}
+        MockHandler.response_status = 200
+        port = self.server.server_address[1]
+        client = WireLog(
+            api_key="sk_test_key",
+            host=f"http://127.0.0.1:{port}",
+            flush_interval=0,
+            auto_insert_id=False,
+        )
+
+        client.track("test")
+        self.assertNotIn("insert_id", MockHandler.last_request["body"])
+
+        client.track("test", insert_id="dedup_1")
+        self.assertEqual(MockHandler.last_request["body"]["insert_id"], "dedup_1")
+
+    def test_compress_gzips_large_bodies_only(self) -> None:
+        MockHandler.response_body = {"accepted": 100}
+        MockHandler.response_status = 200
+        port = self.server.server_address[1]
+        client = WireLog(
+            api_key="sk_test_key",
+            host=f"http://127.0.0.1:{port}",
+            flush_interval=0,
+            compress=True,
+            rate_limit=RateLimitConfig(disabled=True),
+        )
+
+        events = [{"event_type": "page_view", "user_id": f"u_{i}"} for i in range(100)]
+        client.track_batch(events)
+        self.assertEqual(
+            MockHandler.last_request["headers"].get("Content-Encoding"), "gzip"
+        )
+        self.assertEqual(MockHandler.last_request["body"]["events"], events)
+
+        client.track("small")
+        self.assertNotIn("Content-Encoding", MockHandler.last_request["headers"])
+        self.assertEqual(MockHandler.last_request["body"]["event_type"], "small")
+
+    def test_sync_request_retries_transient_errors(self) -> None:
+        MockHandler.response_body = {"rows": []}
+        MockHandler.response_status = 200
+        MockHandler.fail_next = 2
+        client = self._client()
+
+        with mock.patch("wirelog.client.time.sleep") as sleep:
+            result = client.query("* | count")
+
+        self.assertEqual(result, {"rows": []})
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [1.0, 2.0])
+
+    def test_sync_request_gives_up_after_max_retries(self) -> None:
+        MockHandler.response_status = 200
+        MockHandler.fail_next = 5
+        port = self.server.server_address[1]
+        client = WireLog(
+            api_key="sk_test_key",
+            host=f"http://127.0.0.1:{port}",
+            flush_interval=0,
+            max_retries=1,
+        )
+
+        with mock.patch("wirelog.client.time.sleep"):
+            with self.assertRaises(WireLogError) as ctx:
+                client.query("* | count")
+        self.assertEqual(ctx.exception.status, 503)
+        MockHandler.fail_next = 0
+
+    def test_identify_does_not_resend_after_read_timeout(self) -> None:
+        client = self._client()
+        timeout = URLError(socket.timeout("timed out"))
+
+        with mock.patch.object(WireLog, "_post", side_effect=timeout) as post:
+            with mock.patch("wirelog.client.time.sleep"):
+                with self.assertRaises(URLError):
+                    client.identify("u_1", user_property_ops={"$add": {"n": 1}})
+        self.assertEqual(post.call_count, 1)
+
+    def test_identify_retries_connect_failures(self) -> None:
+        client = self._client()
+        refused = _ConnectError(ConnectionRefusedError())
+
+        with mock.patch.object(
+            WireLog, "_post", side_effect=[refused, {"ok": True}]
+        ) as post:
+            with mock.patch("wirelog.client.time.sleep"):
+                self.assertEqual(client.identify("u_1"), {"ok": True})
+        self.assertEqual(post.call_count, 2)
+
+    def test_refused_connection_is_a_connect_error(self) -> None:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        client = WireLog(
+            api_key="sk_test_key",
+            host=f"http://127.0.0.1:{port}",
+            flush_interval=0,
+            max_retries=0,
+        )
+        with self.assertRaises(_ConnectError):
+            client.identify("u_1")
+
+    def test_read_timeouts_resent_only_when_deduplicated(self) -> None:
+        port = self.server.server_address[1]
+        client = WireLog(
+            api_key="sk_test_key",
+            host=f"http://127.0.0.1:{port}",
+            flush_interval=0,
+            auto_insert_id=False,
+            rate_limit=RateLimitConfig(disabled=True),
+        )
+        timeout = URLError(socket.timeout("timed out"))
+
+        with mock.patch("wirelog.client.time.sleep"):
+            with mock.patch.object(WireLog, "_post", side_effect=timeout) as post:
+                with self.assertRaises(URLError):
+                    client.track("test")
+            self.assertEqual(post.call_count, 1)
+
+            with mock.patch.object(
+                WireLog, "_post", side_effect=[timeout, {"accepted": 1}]
+            ) as post:
+                client.track("test", insert_id="dedup_1")
+            self.assertEqual(post.call_count, 2)
+
+            with mock.patch.object(
+                WireLog, "_post", side_effect=[timeout, {"rows": []}]
+            ) as post:
+                client.query("* | count")
+            self.assertEqual(post.call_count, 2)
+
     def test_constructor_defaults(self) -> None:
         client = WireLog()
         self.assertEqual(client.host, "https://api.wirelog.ai")
         self.assertEqual(client.api_key, "")
 
+    def test_bad_host_fails_on_first_request_not_construction(self) -> None:
+        client = WireLog(host="localhost:8080", disabled=True)
+        self.assertIsNone(client.track("test"))
+
+        client = WireLog(host="localhost:8080", flush_interval=0, max_retries=0)
+        with self.assertRaises(ValueError):
+            client.query("* | count")
+
+    def test_instances_have_no_attribute_dict(self) -> None:
+        client = WireLog(api_key="sk_test", flush_interval=0)
+        self.assertFalse(hasattr(client, "__dict__"))
+
+    def test_methods_patchable_on_class(self) -> None:
+        client = WireLog(api_key="sk_test", flush_interval=0)
+        with self.assertRaises(AttributeError):
+            mock.patch.object(client, "track").start()
+        with mock.patch.object(WireLog, "track") as track:
+            client.track("signup")
+        track.assert_called_once_with("signup")
+
+    def test_instances_support_weak_references(self) -> None:
+        client = WireLog(api_key="sk_test", flush_interval=0)
+        self.assertIs(weakref.ref(client)(), client)
+
+    def test_env_fallbacks_read_at_construction(self) -> None:
+        env = {"WIRELOG_API_KEY": "sk_env", "WIRELOG_HOST": "https://example.test/"}
+        with mock.patch.dict("os.environ", env):
+            client = WireLog(flush_interval=0)
+        self.assertEqual(client.api_key, "sk_env")
+        self.assertEqual(client.host, "https://example.test")
+
     def test_host_trailing_slash_stripped(self) -> None:
         client = WireLog(api_key="sk_test", host="https://api.wirelog.ai/")
         self.assertEqual(client.host, "https://api.wirelog.ai")
 
 
+class SlowHandler(BaseHTTPRequestHandler):
+    """Mock server that holds each request briefly and tracks concurrency."""
+
+    lock = Lock()
+    active = 0
+    peak = 0
+    received = 0
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length))
+        with SlowHandler.lock:
+            SlowHandler.active += 1
+            SlowHandler.peak = max(SlowHandler.peak, SlowHandler.active)
+        time.sleep(0.1)
+        with SlowHandler.lock:
+            SlowHandler.active -= 1
+            SlowHandler.received += len(body["events"])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"accepted": 1}')
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class TestBackgroundSending(unittest.TestCase):
+    server: ThreadingHTTPServer
+    thread: Thread
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+        cls.server.daemon_threads = True
+        cls.thread = Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+
+    def setUp(self) -> None:
+        SlowHandler.active = 0
+        SlowHandler.peak = 0
+        SlowHandler.received = 0
+
+    def _client(self, **kwargs: Any) -> WireLog:
+        port = self.server.server_address[1]
+        return WireLog(
+            api_key="sk_test_key",
+            host=f"http://127.0.0.1:{port}",
+            rate_limit=RateLimitConfig(disabled=True),
+            **kwargs,
+        )
+
+    def test_max_in_flight_sends_batches_concurrently(self) -> None:
+        client = self._client(batch_size=1, max_in_flight=4)
+        for i in range(8):
+            client.track("test", user_id=f"u_{i}")
+        client.flush()
+
+        self.assertEqual(SlowHandler.received, 8)
+        self.assertGreater(SlowHandler.peak, 1)
+        self.assertLessEqual(SlowHandler.peak, 4)
+        client.close()
+
+    def test_partial_batch_sent_after_flush_interval(self) -> None:
+        client = self._client(batch_size=10, flush_interval=0.1)
+        client.track("test")
+        time.sleep(1.0)
+
+        self.assertEqual(SlowHandler.received, 1)
+        client.close()
+
+    def test_buffered_events_sent_at_exit_without_close(self) -> None:
+        port = self.server.server_address[1]
+        script = (
+            "from wirelog import RateLimitConfig, WireLog\n"
+            "client = WireLog(api_key='sk_test_key',"
+            f" host='http://127.0.0.1:{port}', batch_size=100,"
+            " flush_interval=60, max_in_flight=4,"
+            " rate_limit=RateLimitConfig(disabled=True))\n"
+            "for _ in range(5):\n"
+            "    client.track('test')\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", script],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stderr, "")
+        self.assertEqual(SlowHandler.received, 5)
+
+    def test_flush_sends_immediately_despite_long_interval(self) -> None:
+        client = self._client(batch_size=10, flush_interval=10)
+        client.track("test")
+        time.sleep(0.2)  # let the worker pick it up and go back to waiting
+        start = time.monotonic()
+        client.flush()
+
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertEqual(SlowHandler.received, 1)
+        client.close()
+
+    def test_unserializable_event_reported_not_fatal(self) -> None:
+        errors: list[Exception] = []
+        client = self._client(batch_size=1, on_error=errors.append)
+        client.track("test", event_properties={"x": object()})
+        client.flush()
+        client.track("test")
+        client.flush()
+
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], TypeError)
+        self.assertEqual(SlowHandler.received, 1)
+        client.close()
+
+    def test_flush_waits_for_delivery(self) -> None:
+        client = self._client(batch_size=5)
+        for _ in range(5):
+            client.track("test")
+        client.flush()
+
+        self.assertEqual(SlowHandler.received, 5)
+        client.close()
+
+
+class TestJsonEncoding(unittest.TestCase):
+    def test_dumps_is_compact_and_accepts_non_str_keys(self) -> None:
+        self.assertEqual(
+            _dumps({"event_type": "signup", 1: "a"}),
+            b'{"event_type":"signup","1":"a"}',
+        )
+
+    def test_dumps_accepts_wide_ints(self) -> None:
+        self.assertEqual(_dumps({"n": 2**70}), b'{"n":1180591620717411303424}')
+
+    def test_dumps_rejects_lone_surrogates(self) -> None:
+        with self.assertRaises((TypeError, ValueError)):
+            _dumps({"s": "\ud800"})
+
+    def test_dumps_writes_non_ascii_as_utf8(self) -> None:
+        expected = '{"p":"%s"}' % ("é" * 100)
+        self.assertEqual(_dumps({"p": "é" * 100}), expected.encode("utf-8"))
+
+    def test_dumps_encodes_orjson_native_types(self) -> None:
+        class Plan(enum.Enum):
+            PRO = "pro"
+
+        @dataclasses.dataclass
+        class Item:
+            sku: str
+            added: datetime.date
+
+        body = {
+            "at": datetime.datetime(2026, 1, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            "id": uuid.UUID(int=1),
+            "plan": Plan.PRO,
+            "item": Item("a1", datetime.date(2026, 1, 2)),
+        }
+        self.assertEqual(
+            _dumps(body),
+            b'{"at":"2026-01-01T12:30:00+00:00",'
+            b'"id":"00000000-0000-0000-0000-000000000001",'
+            b'"plan":"pro","item":{"sku":"a1","added":"2026-01-02"}}',
+        )
+
+    def test_dumps_rejects_unknown_types(self) -> None:
+        with self.assertRaises(TypeError):
+            _dumps({"x": object()})
+
+
+class TestFlatSizeBound(unittest.TestCase):
+    def test_bounds_worst_case_escaping(self) -> None:
+        body = {
+            "event_type": "\x01\x1f" * 3,
+            "insert_id": "a" * 32,
+            "time": "2026-01-01T00:00:00Z",
+            "library": "wirelog-python/0.0.0",
+            "user_id": "\x00\n\"",
+            "clientOriginated": True,
+        }
+        self.assertGreaterEqual(_flat_size_bound(body), len(_dumps(body)))
+
+    def test_unknown_value_types_have_no_bound(self) -> None:
+        self.assertEqual(_flat_size_bound({"event_type": "x", "user_id": 7}), -1)
+
+    def test_non_ascii_strings_have_no_bound(self) -> None:
+        self.assertEqual(_flat_size_bound({"event_type": "\U0001f600"}), -1)
+        self.assertEqual(_flat_size_bound({"event_type": "\ud800"}), -1)
+
+
+class TestIsoNow(unittest.TestCase):
+    def test_formats_and_refreshes_each_second(self) -> None:
+        with mock.patch("wirelog.client.time.time", return_value=0.25):
+            self.assertEqual(_iso_now(), "1970-01-01T00:00:00Z")
+        with mock.patch("wirelog.client.time.time", return_value=0.75):
+            self.assertEqual(_iso_now(), "1970-01-01T00:00:00Z")
+        with mock.patch("wirelog.client.time.time", return_value=61.0):
+            self.assertEqual(_iso_now(), "1970-01-01T00:01:01Z")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -482,7 +482,7 @@ class TestClientIntegration(unittest.TestCase):
         self.assertEqual(result, {"accepted": 0})
         self.assertEqual(len(_MockHandler.requests), 0)
 
-    def test_track_batch_rejects_over_2000(self) -> None:
+    def test_track_batch_splits_large_batches(self) -> None:
         client = WireLog(
             api_key="sk_test",
             host=self._url(),
@@ -490,9 +490,11 @@ class TestClientIntegration(unittest.TestCase):
             rate_limit=RateLimitConfig(disabled=True),
         )
         events = [{"event_type": "e"} for _ in range(2001)]
-        with self.assertRaises(ValueError):
-            client.track_batch(events)
-        self.assertEqual(len(_MockHandler.requests), 0)
+        result = client.track_batch(events)
+        sizes = [len(r["body"]["events"]) for r in _MockHandler.requests]
+        self.assertEqual(sizes, [500, 500, 500, 500, 1])
+        # The mock accepts 1 per request; counts are summed across chunks.
+        self.assertEqual(result, {"accepted": 5})
 
     def test_track_batch_drops_oversize_events_individually(self) -> None:
         errors: list[Exception] = []
@@ -572,6 +574,7 @@ class TestClientIntegration(unittest.TestCase):
             api_key="sk_test",
             host=self._url(),
             flush_interval=0,
+            max_retries=0,
         )
         try:
             client.track("test")
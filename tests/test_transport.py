@@ -0,0 +1,207 @@
+"""Tests for the keep-alive connection pool."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Any
+from unittest import mock
+from urllib.error import URLError
+
+from wirelog import WireLog
+from wirelog import transport
+from wirelog.transport import ConnectionPool, drain, shared_pool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler that records which connection served each request."""
+
+    protocol_version = "HTTP/1.1"
+    connections: set[int] = set()
+    paths: list[str] = []
+    api_keys: list[str] = []
+
+    # Close the socket after each response without announcing it, like a
+    # server dropping an idle keep-alive connection.
+    drop_after_response = False
+    # Close the socket after reading a request, without responding.
+    drop_before_response = False
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        KeepAliveHandler.connections.add(id(self.connection))
+        KeepAliveHandler.paths.append(self.path)
+        KeepAliveHandler.api_keys.append(self.headers.get("X-Api-Key", ""))
+        if KeepAliveHandler.drop_before_response:
+            self.close_connection = True
+            return
+        payload = json.dumps({"accepted": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        if KeepAliveHandler.drop_after_response:
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class ShortKeepAliveHandler(KeepAliveHandler):
+    """Closes connections that stay idle for more than 0.3 s."""
+
+    timeout = 0.3
+
+
+class TestConnectionPool(unittest.TestCase):
+    server: ThreadingHTTPServer
+    thread: Thread
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        cls.server.daemon_threads = True
+        cls.thread = Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+
+    def setUp(self) -> None:
+        KeepAliveHandler.connections = set()
+        KeepAliveHandler.paths = []
+        KeepAliveHandler.api_keys = []
+        KeepAliveHandler.drop_after_response = False
+        KeepAliveHandler.drop_before_response = False
+
+    def _url(self) -> str:
+        port = self.server.server_address[1]
+        return f"http://127.0.0.1:{port}"
+
+    def test_sequential_requests_reuse_one_connection(self) -> None:
+        client = WireLog(api_key="sk_test", host=self._url(), flush_interval=0)
+        for _ in range(5):
+            client.track("test")
+        client.close()
+        self.assertEqual(len(KeepAliveHandler.paths), 5)
+        self.assertEqual(len(KeepAliveHandler.connections), 1)
+
+    def test_reconnects_when_server_drops_idle_connection(self) -> None:
+        KeepAliveHandler.drop_after_response = True
+        client = WireLog(
+            api_key="sk_test", host=self._url(), flush_interval=0, max_retries=0
+        )
+        for _ in range(3):
+            self.assertEqual(client.track("test"), {"accepted": 1})
+        client.close()
+        self.assertEqual(len(KeepAliveHandler.paths), 3)
+
+    def test_idle_connections_closed_by_server_are_discarded(self) -> None:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ShortKeepAliveHandler)
+        server.daemon_threads = True
+        Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            pool = ConnectionPool(url, timeout=5)
+            with pool.connection() as a, pool.connection() as b, pool.connection() as c:
+                for conn in (a, b, c):
+                    conn.request("POST", pool.target("/identify"), body=b"{}")
+                    drain(conn.getresponse())
+            self.assertEqual(len(pool._idle), 3)
+            time.sleep(1.0)  # the server times out all three
+
+            with pool.connection() as conn:
+                conn.request("POST", pool.target("/identify"), body=b"{}")
+                self.assertEqual(conn.getresponse().status, 200)
+            pool.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_identify_not_resent_when_dropped_after_sending(self) -> None:
+        client = WireLog(
+            api_key="sk_test", host=self._url(), flush_interval=0, max_retries=0
+        )
+        client.identify("u_1")
+        KeepAliveHandler.drop_before_response = True
+        with self.assertRaises(URLError):
+            client.identify("u_1")
+        self.assertEqual(KeepAliveHandler.paths, ["/identify", "/identify"])
+
+    def test_clients_for_same_host_share_connections(self) -> None:
+        first = WireLog(api_key="sk_tenant_a", host=self._url(), flush_interval=0)
+        second = WireLog(api_key="sk_tenant_b", host=self._url(), flush_interval=0)
+
+        first.track("test")
+        second.track("test")
+        first.track("test")
+
+        self.assertIs(first._pool, second._pool)
+        self.assertEqual(
+            KeepAliveHandler.api_keys, ["sk_tenant_a", "sk_tenant_b", "sk_tenant_a"]
+        )
+        self.assertEqual(len(KeepAliveHandler.connections), 1)
+
+    def test_shared_pools_evict_least_recently_used(self) -> None:
+        with mock.patch.object(transport, "_MAX_SHARED_POOLS", 2):
+            a = shared_pool("http://a.example", timeout=1)
+            b = shared_pool("http://b.example", timeout=1)
+            self.assertIs(shared_pool("http://a.example", timeout=1), a)
+            shared_pool("http://c.example", timeout=1)
+
+            self.assertIs(shared_pool("http://a.example", timeout=1), a)
+            self.assertIsNot(shared_pool("http://b.example", timeout=1), b)
+
+    def test_target_keeps_base_path(self) -> None:
+        pool = ConnectionPool(f"{self._url()}/api/", timeout=5)
+        self.assertEqual(pool.target("/track"), "/api/track")
+
+    def test_rejects_unsupported_scheme(self) -> None:
+        with self.assertRaises(ValueError):
+            ConnectionPool("ftp://api.wirelog.ai", timeout=5)
+
+    def test_idle_connections_capped_at_maxsize(self) -> None:
+        pool = ConnectionPool(self._url(), timeout=5, maxsize=1)
+        with pool.connection() as first, pool.connection() as second:
+            self.assertIsNot(first, second)
+        self.assertEqual(len(pool._idle), 1)
+        pool.close()
+        self.assertEqual(pool._idle, [])
+
+    def test_fresh_connection_bypasses_idle_ones(self) -> None:
+        pool = ConnectionPool(self._url(), timeout=5)
+        with pool.connection() as conn:
+            conn.connect()
+        with pool.connection(fresh=True) as conn:
+            self.assertIsNone(conn.sock)
+        self.assertEqual(len(pool._idle), 2)
+        pool.close()
+
+    def test_drain_consumes_body_and_keeps_connection(self) -> None:
+        pool = ConnectionPool(self._url(), timeout=5)
+        for _ in range(3):
+            with pool.connection() as conn:
+                conn.request("POST", pool.target("/track"), body=b"{}")
+                resp = conn.getresponse()
+                drain(resp)
+                self.assertTrue(resp.isclosed())
+        pool.close()
+        self.assertEqual(len(KeepAliveHandler.connections), 1)
+
+    def test_http_proxy_uses_absolute_target_and_auth(self) -> None:
+        env = {"http_proxy": "http://user:pw@proxy.local:3128", "no_proxy": ""}
+        with mock.patch.dict(os.environ, env):
+            pool = ConnectionPool("http://api.example.com", timeout=5)
+        self.assertEqual(pool.target("/track"), "http://api.example.com/track")
+        self.assertEqual(pool.headers["Proxy-Authorization"], "Basic dXNlcjpwdw==")
+
+
+if __name__ == "__main__":
+    unittest.main()